@@ -9,12 +9,55 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import json
+import mmap
 import os
 import time
+from collections import Counter
 from pathlib import Path
-from datetime import datetime, timedelta
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Step columns used by the charts and issue detection
+STEP_COLUMNS = [
+    "global_step", "timestamp", "train_loss", "lr", "grad_norm", "gpu_mem_allocated",
+    "samples_per_sec", "cpu_mem_rss_mb", "val_loss", "nan_inf_detected",
+]
+# Metric columns stored as float32; plenty of precision for plotting
+FLOAT32_COLUMNS = [
+    "train_loss", "lr", "grad_norm", "gpu_mem_allocated", "samples_per_sec",
+    "cpu_mem_rss_mb", "val_loss",
+]
+# Unread regions at least this large are split via mmap instead of read()
+MMAP_MIN_BYTES = 1 << 20
+# Upper bound on points per trace sent to the browser
+MAX_PLOT_POINTS = 5000
+# Rewrite the Parquet step snapshot once this many new steps have arrived
+PARQUET_REFRESH_ROWS = 1000
+# Seconds between live panel refreshes when auto-refresh is on
+REFRESH_SECONDS = 5
+
+def _json_loads(line):
+    """Decode one JSON record, preferring orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN/Infinity tokens json.dump writes for
+            # diverged losses; let the stdlib parser handle those records
+            pass
+    return json.loads(line)
+
 # Page config
 st.set_page_config(
     page_title="AI Toolkit Training Dashboard",
@@ -23,22 +66,119 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def _mmap_lines(f, offset):
+    """Split the bytes of ``f`` after ``offset`` into complete lines.
+
+    The file is memory-mapped and newlines are located with one vectorized
+    NumPy comparison instead of buffered line iteration. Returns
+    ``(lines, partial_tail, end_offset)``.
+    """
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = len(mm)
+        buf = np.frombuffer(mm, dtype=np.uint8, count=end - offset, offset=offset)
+        newlines = np.flatnonzero(buf == 0x0A) + offset
+        del buf  # the mmap cannot close while a NumPy view is alive
+        starts = np.concatenate(([offset], newlines[:-1] + 1))
+        lines = [mm[start:stop] for start, stop in zip(starts.tolist(), newlines.tolist())]
+        tail_start = int(newlines[-1]) + 1 if len(newlines) else offset
+        return lines, mm[tail_start:end], end
+
+def _tail_load(path, cache):
+    """Parse only the bytes appended to a JSONL file since the last call.
+
+    The cache entry for ``path`` keeps the read offset and any trailing
+    partial line; it is reset if the file shrinks or is replaced.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        cache.pop(path, None)
+        return []
+
+    entry = cache.get(path)
+    if entry is None or stat.st_ino != entry["inode"] or stat.st_size < entry["offset"]:
+        entry = {"inode": stat.st_ino, "mtime": stat.st_mtime, "size": 0,
+                 "offset": 0, "leftover": b"", "records": []}
+        cache[path] = entry
+
+    if stat.st_size == entry["offset"]:
+        return entry["records"]
+
+    with open(path, 'rb') as f:
+        if stat.st_size - entry["offset"] >= MMAP_MIN_BYTES:
+            lines, leftover, offset = _mmap_lines(f, entry["offset"])
+            if lines:
+                lines[0] = entry["leftover"] + lines[0]
+            else:
+                leftover = entry["leftover"] + leftover
+        else:
+            f.seek(entry["offset"])
+            chunk = f.read()
+            offset = f.tell()
+            lines = (entry["leftover"] + chunk).split(b'\n')
+            # The writer may be mid-line; keep the partial tail for the next read
+            leftover = lines.pop()
+    entry["offset"] = offset
+    entry["leftover"] = leftover
+    entry["mtime"] = stat.st_mtime
+    entry["size"] = stat.st_size
+
+    records = entry["records"]
+    try:
+        # The trainer only appends whole records and the partial tail is
+        # held back above, so every complete line normally parses cleanly
+        records.extend([_json_loads(line) for line in lines])
+    except json.JSONDecodeError:
+        # A blank or torn line (e.g. after a crash); redo this batch per line
+        for line in lines:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(_json_loads(line))
+                except json.JSONDecodeError:
+                    # Skip malformed lines
+                    continue
+    return records
+
 def load_jsonl_data(file_path):
-    """Load data from JSONL file."""
-    data = []
+    """Load data from JSONL file, reading only newly appended lines."""
+    cache = st.session_state.setdefault("_jsonl_cache", {})
+    return _tail_load(str(file_path), cache)
+
+def _read_start_record(path):
+    """Read a metrics file only as far as its first "start" record."""
     try:
-        with open(file_path, 'r') as f:
+        with open(path, 'rb') as f:
             for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        data.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        # Skip malformed lines (partially written)
-                        continue
+                try:
+                    record = _json_loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("event") == "start":
+                    return record
     except FileNotFoundError:
         pass
-    return data
+    return None
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _scan_runs(logs_dir, logs_mtime):
+    """Collect run metadata; cached on the mtime of the logs directory."""
+    runs = []
+    for run_dir in Path(logs_dir).iterdir():
+        if run_dir.is_dir():
+            metrics_file = run_dir / "metrics.jsonl"
+            if metrics_file.exists():
+                start_record = _read_start_record(metrics_file)
+                if start_record:
+                    runs.append({
+                        "name": run_dir.name,
+                        "path": str(metrics_file),
+                        "start_time": start_record.get("timestamp", "Unknown"),
+                        "config_name": start_record.get("config_name", "Unknown"),
+                        "process_type": start_record.get("process_type", "Unknown")
+                    })
+    
+    return sorted(runs, key=lambda x: x["start_time"], reverse=True)
 
 def get_available_runs():
     """Get list of available training runs."""
@@ -46,144 +186,447 @@ def get_available_runs():
     if not logs_dir.exists():
         return []
     
-    runs = []
-    for run_dir in logs_dir.iterdir():
-        if run_dir.is_dir():
-            metrics_file = run_dir / "metrics.jsonl"
-            if metrics_file.exists():
-                # Get run info from first record
-                data = load_jsonl_data(metrics_file)
-                if data:
-                    start_record = next((r for r in data if r.get("event") == "start"), None)
-                    if start_record:
-                        runs.append({
-                            "name": run_dir.name,
-                            "path": str(metrics_file),
-                            "start_time": start_record.get("timestamp", "Unknown"),
-                            "config_name": start_record.get("config_name", "Unknown"),
-                            "process_type": start_record.get("process_type", "Unknown")
-                        })
+    return _scan_runs(str(logs_dir), logs_dir.stat().st_mtime)
+
+def _parquet_path(path):
+    """Location of the columnar step snapshot for a metrics file."""
+    return Path(path).with_suffix(".parquet")
+
+def _snapshot_key(step_records):
+    """Identify a run by its first step's ``time``.
+
+    The inode alone is not enough: a run restarted under the same name often
+    gets the old file's inode back.
+    """
+    return repr(step_records[0].get("time")) if step_records else ""
+
+def _read_parquet_snapshot(path, inode, run_key, n_steps):
+    """Read the step snapshot if it still describes a prefix of the JSONL file.
+
+    Returns ``(df, covered_steps)`` or ``(None, 0)`` when there is no usable
+    snapshot.
+    """
+    parquet_file = _parquet_path(path)
+    if pq is None or not parquet_file.exists():
+        return None, 0
+    try:
+        schema = pq.read_schema(parquet_file)
+        meta = schema.metadata or {}
+        if int(meta.get(b"jsonl_inode", -1)) != inode:
+            return None, 0
+        if meta.get(b"first_step_time", b"").decode() != run_key:
+            return None, 0
+        covered = int(meta.get(b"step_count", 0))
+        if covered > n_steps:
+            return None, 0
+        columns = [c for c in STEP_COLUMNS if c in schema.names]
+        return pd.read_parquet(parquet_file, columns=columns), covered
+    except Exception:
+        # A stale or half-written snapshot only costs us a full rebuild
+        return None, 0
+
+def _write_parquet_snapshot(path, inode, run_key, df):
+    """Persist the step table next to the JSONL file; best effort."""
+    if pa is None:
+        return
+    parquet_file = _parquet_path(path)
+    tmp_file = parquet_file.with_suffix(".parquet.tmp")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"jsonl_inode": str(inode).encode(),
+            b"first_step_time": run_key.encode(),
+            b"step_count": str(len(df)).encode(),
+        })
+        pq.write_table(table, tmp_file)
+        os.replace(tmp_file, parquet_file)
+    except Exception:
+        pass
+
+def _prepare_step_rows(step_records):
+    """Build a projected, typed DataFrame from step records."""
+    # Only the plotted fields are pulled out of each record, so extra keys
+    # (loss components, config echoes) never become sparse columns
+    rows = [tuple(r.get(k) for k in STEP_COLUMNS) for r in step_records]
+    df = pd.DataFrame(rows, columns=STEP_COLUMNS)
+    # Writer timestamps are naive datetime.isoformat() strings, which omit the
+    # fraction when microseconds are 0; ISO8601 mode handles both shapes.
+    # A missing or garbled timestamp becomes NaT rather than failing the load.
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', cache=True, errors='coerce')
+    
+    # Downcast to halve the bytes moved through pandas, plotly and the browser
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float32)
+    if 'global_step' in df.columns and df['global_step'].notna().all():
+        df['global_step'] = df['global_step'].astype(np.int32)
+    return df
+
+def _jsonl_to_parquet(path, step_records):
+    """Build the step table, reusing and refreshing the Parquet snapshot.
+
+    Returns ``(df, snapshot_steps)`` where ``snapshot_steps`` is the number of
+    steps the on-disk snapshot now covers.
+    """
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        return _prepare_step_rows(step_records), 0
+    
+    run_key = _snapshot_key(step_records)
+    snapshot, covered = _read_parquet_snapshot(path, inode, run_key, len(step_records))
+    if snapshot is None:
+        df = _prepare_step_rows(step_records)
+    elif covered == len(step_records):
+        df = snapshot
+    else:
+        df = pd.concat([snapshot, _prepare_step_rows(step_records[covered:])], ignore_index=True)
     
-    return sorted(runs, key=lambda x: x["start_time"], reverse=True)
+    if len(step_records) - covered >= PARQUET_REFRESH_ROWS:
+        _write_parquet_snapshot(path, inode, run_key, df)
+        covered = len(step_records)
+    return df, covered
+
+def load_step_df(path, step_records):
+    """Return the step DataFrame, appending only rows added since the last call.
+
+    The frame lives in the JSONL tail-cache entry for ``path``, so it is
+    discarded together with the parsed records when the file is replaced.
+    """
+    cache = st.session_state.setdefault("_jsonl_cache", {})
+    entry = cache.get(str(path))
+    if entry is None:
+        return _jsonl_to_parquet(path, step_records)[0]
+    
+    n_steps = len(step_records)
+    df = entry.get("step_df")
+    if df is None or entry["step_count"] > n_steps:
+        df, entry["snapshot_count"] = _jsonl_to_parquet(path, step_records)
+    elif entry["step_count"] < n_steps:
+        new_rows = _prepare_step_rows(step_records[entry["step_count"]:])
+        df = pd.concat([df, new_rows], ignore_index=True)
+        if n_steps - entry["snapshot_count"] >= PARQUET_REFRESH_ROWS:
+            _write_parquet_snapshot(path, entry["inode"], _snapshot_key(step_records), df)
+            entry["snapshot_count"] = n_steps
+    
+    entry["step_df"] = df
+    entry["step_count"] = n_steps
+    return df
 
 def apply_ema_smoothing(values, alpha=0.1):
     """Apply exponential moving average smoothing."""
-    if not values:
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
         return values
     
-    smoothed = [values[0]]
-    for i in range(1, len(values)):
-        smoothed.append(alpha * values[i] + (1 - alpha) * smoothed[i-1])
-    return smoothed
+    # Gaps and diverged (inf) steps carry the previous average forward
+    # instead of dragging it to zero or poisoning every later value
+    values = np.where(np.isfinite(values), values, np.nan)
+    
+    # adjust=False gives the recursive form s[i] = a*x[i] + (1-a)*s[i-1]
+    return pd.Series(values).ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy()
 
-def detect_training_issues(data):
-    """Detect potential training issues."""
+def detect_training_issues(df):
+    """Detect potential training issues from the step DataFrame."""
     issues = []
     
-    # Get step records
-    step_records = [r for r in data if r.get("event") == "step"]
-    if not step_records:
+    if df is None or df.empty:
         return issues
     
-    recent_steps = step_records[-50:]  # Last 50 steps
+    recent_steps = df.tail(50)  # Last 50 steps
+    columns = recent_steps.columns
+    
+    # Reduce the window once up front; every check below branches on scalars
+    maxes = recent_steps[[c for c in ('grad_norm', 'gpu_mem_allocated') if c in columns]].max()
+    nan_count = 0
+    if 'nan_inf_detected' in columns:
+        nan_count = int(recent_steps['nan_inf_detected'].fillna(False).astype(bool).sum())
+    recent_losses = None
+    if 'train_loss' in columns:
+        losses = recent_steps['train_loss'].dropna().to_numpy()
+        if len(losses) > 20:
+            recent_losses = losses[-20:]
     
     # Check for NaN/Inf
-    nan_count = sum(1 for r in recent_steps if r.get("nan_inf_detected", False))
     if nan_count > 0:
         issues.append(f"🚨 NaN/Inf detected in {nan_count} recent steps")
     
     # Check for loss plateau
-    losses = [r.get("train_loss", 0) for r in recent_steps if r.get("train_loss") is not None]
-    if len(losses) > 20:
-        recent_losses = losses[-20:]
+    if recent_losses is not None:
         loss_std = np.std(recent_losses)
         loss_mean = np.mean(recent_losses)
         if loss_std < 0.01 * abs(loss_mean) and loss_mean > 0.001:
             issues.append("📈 Potential loss plateau detected")
     
     # Check for exploding gradients
-    grad_norms = [r.get("grad_norm") for r in recent_steps if r.get("grad_norm") is not None]
-    if grad_norms:
-        max_grad = max(grad_norms)
-        if max_grad > 10.0:
-            issues.append(f"💥 High gradient norm detected: {max_grad:.2f}")
+    max_grad = maxes.get('grad_norm')
+    if max_grad is not None and max_grad > 10.0:
+        issues.append(f"💥 High gradient norm detected: {max_grad:.2f}")
     
     # Check for low GPU utilization (if VRAM usage is very low)
-    gpu_usage = [r.get("gpu_mem_allocated", 0) for r in recent_steps]
-    if gpu_usage and max(gpu_usage) < 1.0:  # Less than 1GB
+    max_gpu = maxes.get('gpu_mem_allocated')
+    if max_gpu is not None and max_gpu < 1.0:  # Less than 1GB
         issues.append("🐌 Potentially low GPU utilization")
     
     # Check for overfitting (if validation loss available and increasing)
-    val_losses = [r.get("val_loss") for r in step_records if r.get("val_loss") is not None]
-    if len(val_losses) > 10:
-        recent_val = val_losses[-5:]
-        earlier_val = val_losses[-10:-5]
-        if len(recent_val) == 5 and len(earlier_val) == 5:
+    if 'val_loss' in df.columns:
+        val_losses = df['val_loss'].dropna().to_numpy()
+        if len(val_losses) > 10:
+            recent_val = val_losses[-5:]
+            earlier_val = val_losses[-10:-5]
             if np.mean(recent_val) > np.mean(earlier_val) * 1.1:
                 issues.append("📊 Potential overfitting detected")
     
     return issues
 
+def load_training_issues(path, df):
+    """Return detect_training_issues(df), recomputed only when steps arrive.
+
+    Like the step DataFrame, the result is kept in the run's tail-cache
+    entry and keyed on the number of step rows it was computed from.
+    """
+    entry = st.session_state.setdefault("_jsonl_cache", {}).get(str(path))
+    n_steps = 0 if df is None else len(df)
+    if entry is None:
+        return detect_training_issues(df)
+    
+    if entry.get("issues_count") != n_steps:
+        entry["issues"] = detect_training_issues(df)
+        entry["issues_count"] = n_steps
+    return entry["issues"]
+
+def _plot_index(n_points):
+    """Indexer that keeps a trace near MAX_PLOT_POINTS points.
+
+    Takes every stride-th point plus the newest one, so decimated live charts
+    still end at the latest step.
+    """
+    stride = max(1, -(-n_points // MAX_PLOT_POINTS))
+    if stride == 1:
+        return slice(None)
+    return np.unique(np.r_[0:n_points:stride, n_points - 1])
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_loss_figure(steps, losses, use_smoothing, log_scale):
+    """Build the loss chart; cached on the data and both toggles."""
+    fig_loss = go.Figure()
+    
+    if losses is not None:
+        # Decimate long runs; smoothing still sees every step
+        idx = _plot_index(len(steps))
+        x = steps[idx]
+        if use_smoothing:
+            fig_loss.add_traces([
+                go.Scattergl(
+                    x=x,
+                    y=apply_ema_smoothing(losses)[idx],
+                    mode='lines',
+                    name='Loss (smoothed)',
+                    line=dict(color='blue')
+                ),
+                go.Scattergl(
+                    x=x,
+                    y=losses[idx],
+                    mode='lines',
+                    name='Loss (raw)',
+                    line=dict(color='lightblue', width=1),
+                    opacity=0.3
+                ),
+            ])
+        else:
+            fig_loss.add_trace(go.Scattergl(
+                x=x,
+                y=losses[idx],
+                mode='lines',
+                name='Loss',
+                line=dict(color='blue')
+            ))
+    
+    fig_loss.update_layout(
+        xaxis_title="Step",
+        yaxis_title="Loss",
+        yaxis_type="log" if log_scale else "linear",
+        height=400
+    )
+    return fig_loss
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_lr_figure(steps, lrs):
+    """Build the learning rate chart."""
+    fig_lr = go.Figure()
+    
+    if lrs is not None:
+        idx = _plot_index(len(steps))
+        fig_lr.add_trace(go.Scattergl(
+            x=steps[idx],
+            y=lrs[idx],
+            mode='lines',
+            name='Learning Rate',
+            line=dict(color='green')
+        ))
+    
+    fig_lr.update_layout(
+        xaxis_title="Step",
+        yaxis_title="Learning Rate",
+        height=300
+    )
+    return fig_lr
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_metrics_figure(steps, metrics):
+    """Build the 2x2 system metrics chart from a column-name -> values dict."""
+    fig_multi = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Gradient Norm', 'GPU Memory (GB)', 'Speed (samples/sec)', 'CPU Memory (MB)'),
+        vertical_spacing=0.1
+    )
+    idx = _plot_index(len(steps))
+    x = steps[idx]
+    
+    # (column, row, col, trace options) for each panel, in subplot order
+    panels = [
+        ('grad_norm', 1, 1, dict(name='Grad Norm')),
+        ('gpu_mem_allocated', 1, 2, dict(name='GPU Mem', line=dict(color='red'))),
+        ('samples_per_sec', 2, 1, dict(name='Speed', line=dict(color='purple'))),
+        ('cpu_mem_rss_mb', 2, 2, dict(name='CPU Mem', line=dict(color='orange'))),
+    ]
+    traces, rows, cols = [], [], []
+    for name, row, col, options in panels:
+        if metrics.get(name) is not None:
+            traces.append(go.Scattergl(x=x, y=metrics[name][idx], mode='lines', **options))
+            rows.append(row)
+            cols.append(col)
+    
+    # One batched insert validates the layout once instead of per trace
+    if traces:
+        fig_multi.add_traces(traces, rows=rows, cols=cols)
+    
+    fig_multi.update_layout(height=600, showlegend=False)
+    return fig_multi
+
 def write_control_file(run_path, control_data):
     """Write control file for run."""
     run_dir = Path(run_path).parent
     control_file = run_dir / "control.json"
     
-    control_data["timestamp"] = time.time()
+    # Re-applying the same values would only restart the trainer's debounce
+    written = st.session_state.setdefault("_control_written", {})
+    if written.get(str(control_file)) == control_data and control_file.exists():
+        return True
+    
+    payload_data = dict(control_data, timestamp=time.time())
     
     try:
-        with open(control_file, 'w') as f:
-            json.dump(control_data, f, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(payload_data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(payload_data, indent=2).encode('utf-8')
+        # Replace atomically so the trainer never reads a half-written file
+        tmp_file = control_file.with_name(control_file.name + ".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_file, control_file)
+        written[str(control_file)] = dict(control_data)
         return True
     except Exception as e:
         st.error(f"Failed to write control file: {e}")
         return False
 
-def main():
-    st.title("🚀 AI Toolkit Training Dashboard")
-    st.markdown("Real-time monitoring and control for AI Toolkit training runs")
+def _apply_log_every(run_path):
+    """Button callback: push the slider's log interval to the trainer."""
+    log_every = st.session_state["log_every"]
+    if write_control_file(run_path, {"log_every": log_every}):
+        st.toast(f"Set log_every to {log_every}")
+    else:
+        st.toast("Failed to apply setting")
+
+def render_run(selected_run, auto_refresh):
+    """Render the header and training controls, then the live run panel."""
+    data = load_jsonl_data(selected_run["path"])
+    if not data:
+        st.error("No data available for selected run")
+        return
     
-    # Sidebar - Run selection
-    st.sidebar.header("Training Runs")
+    st.header(f"📊 {selected_run['name']}")
     
-    runs = get_available_runs()
-    if not runs:
-        st.warning("No training runs found in ./logs/ directory")
-        st.info("Start a training run with telemetry enabled to see data here.")
-        return
+    render_control_panel(selected_run, [r for r in data if r.get("event") == "step"])
     
-    # Run selector
-    run_options = [f"{r['name']} ({r['config_name']})" for r in runs]
-    selected_idx = st.sidebar.selectbox(
-        "Select training run:",
-        range(len(run_options)),
-        format_func=lambda x: run_options[x]
+    # Only the live panel reruns on the timer; the sidebar and header stay put
+    live_panel = st.fragment(render_live_panel, run_every=REFRESH_SECONDS if auto_refresh else None)
+    live_panel(selected_run)
+
+def render_control_panel(selected_run, step_records):
+    """Render the sidebar control for the trainer's log interval."""
+    st.sidebar.header("⚙️ Training Control")
+    
+    current_log_every = 100  # Default
+    if step_records:
+        # Try to infer current log_every from step intervals
+        steps = [r.get("global_step", 0) for r in step_records[-10:]]
+        intervals = [b - a for a, b in zip(steps, steps[1:])]
+        if intervals:
+            current_log_every = Counter(intervals).most_common(1)[0][0]
+            # Same clamp the trainer applies to control-file values
+            current_log_every = max(5, min(2000, current_log_every))
+    
+    st.sidebar.slider(
+        "Log Every (steps)",
+        min_value=5,
+        max_value=2000,
+        value=current_log_every,
+        step=5,
+        key="log_every",
+        help="Adjust logging frequency. Changes apply after 30s debounce."
     )
     
-    selected_run = runs[selected_idx]
+    # The callback writes the file before the rerun starts rendering
+    st.sidebar.button("📝 Apply Log Interval", on_click=_apply_log_every, args=(selected_run["path"],))
+
+def render_charts(df):
+    """Render whichever of the loss, learning rate or system metric charts is selected."""
+    steps = df['global_step'].to_numpy()
+    
+    # NaNs are kept so Plotly leaves a gap instead of plotting a fake zero
+    def _column(name):
+        return df[name].to_numpy() if name in df.columns else None
+    
+    # Tabs would run every tab body on each refresh; a selector lets the
+    # hidden figures skip their build and websocket payload entirely
+    view = st.radio(
+        "Chart",
+        ["📉 Training Loss", "📊 Learning Rate", "📈 Training Metrics"],
+        horizontal=True,
+        key="chart_view",
+        label_visibility="collapsed"
+    )
     
-    # Auto-refresh toggle
-    auto_refresh = st.sidebar.checkbox("Auto-refresh (5s)", value=True)
-    if auto_refresh:
-        time.sleep(5)
-        st.rerun()
+    if view == "📉 Training Loss":
+        # Smoothing option
+        use_smoothing = st.checkbox("📈 Apply EMA smoothing", value=True)
+        log_scale = st.checkbox("Log scale", key="loss_log")
+        fig_loss = build_loss_figure(steps, _column('train_loss'), use_smoothing, log_scale)
+        st.plotly_chart(fig_loss, use_container_width=True)
     
-    # Manual refresh button
-    if st.sidebar.button("🔄 Refresh Now"):
-        st.rerun()
+    elif view == "📊 Learning Rate":
+        fig_lr = build_lr_figure(steps, _column('lr'))
+        st.plotly_chart(fig_lr, use_container_width=True)
     
-    # Load data
+    else:
+        fig_multi = build_metrics_figure(steps, {
+            name: _column(name)
+            for name in ('grad_norm', 'gpu_mem_allocated', 'samples_per_sec', 'cpu_mem_rss_mb')
+        })
+        st.plotly_chart(fig_multi, use_container_width=True)
+
+def render_live_panel(selected_run):
+    """Render summary cards, issues, charts and recent events for the run."""
     data = load_jsonl_data(selected_run["path"])
-    if not data:
-        st.error("No data available for selected run")
-        return
     
     # Run info
     start_record = next((r for r in data if r.get("event") == "start"), None)
     step_records = [r for r in data if r.get("event") == "step"]
     
-    st.header(f"📊 {selected_run['name']}")
-    
     # Run summary
     col1, col2, col3, col4 = st.columns(4)
     
@@ -201,22 +644,28 @@ def main():
         else:
             st.metric("Progress", "0/Unknown")
     
+    # The logger writes non-finite floats as null, so a value may be None
     with col3:
-        if step_records:
-            current_loss = step_records[-1].get("train_loss", 0)
+        current_loss = step_records[-1].get("train_loss", 0) if step_records else None
+        if current_loss is not None:
             st.metric("Current Loss", f"{current_loss:.4f}")
         else:
             st.metric("Current Loss", "N/A")
     
     with col4:
-        if step_records:
-            current_lr = step_records[-1].get("lr", 0)
+        current_lr = step_records[-1].get("lr", 0) if step_records else None
+        if current_lr is not None:
             st.metric("Learning Rate", f"{current_lr:.2e}")
         else:
             st.metric("Learning Rate", "N/A")
     
+    # Prepare data for charts and issue detection
+    df = None
+    if step_records:
+        df = load_step_df(selected_run["path"], step_records)
+    
     # Training issues
-    issues = detect_training_issues(data)
+    issues = load_training_issues(selected_run["path"], df)
     if issues:
         st.error("**Training Issues Detected:**")
         for issue in issues:
@@ -224,171 +673,77 @@ def main():
     else:
         st.success("✅ No training issues detected")
     
-    # Control panel
-    st.sidebar.header("⚙️ Training Control")
-    
-    current_log_every = 100  # Default
-    if step_records:
-        # Try to infer current log_every from step intervals
-        steps = [r.get("global_step", 0) for r in step_records[-10:]]
-        if len(steps) > 1:
-            intervals = [steps[i] - steps[i-1] for i in range(1, len(steps))]
-            if intervals:
-                current_log_every = max(set(intervals), key=intervals.count)
-    
-    new_log_every = st.sidebar.slider(
-        "Log Every (steps)",
-        min_value=5,
-        max_value=2000,
-        value=current_log_every,
-        step=5,
-        help="Adjust logging frequency. Changes apply after 30s debounce."
-    )
-    
-    if st.sidebar.button("📝 Apply Log Interval"):
-        if write_control_file(selected_run["path"], {"log_every": new_log_every}):
-            st.sidebar.success(f"Set log_every to {new_log_every}")
-        else:
-            st.sidebar.error("Failed to apply setting")
-    
     # Charts
     if not step_records:
         st.warning("No step data available yet")
         return
     
-    # Prepare data for charts
-    df = pd.DataFrame(step_records)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    
-    # Smoothing option
-    use_smoothing = st.checkbox("📈 Apply EMA smoothing", value=True)
+    # Charts are the expensive part of a refresh; hidden charts cost nothing
+    if st.toggle("Show charts", value=True, key="show_charts"):
+        render_charts(df)
     
-    # Loss plot
-    st.subheader("📉 Training Loss")
-    fig_loss = go.Figure()
+    # Recent events table
+    st.subheader("📋 Recent Events")
     
-    if 'train_loss' in df.columns:
-        losses = df['train_loss'].fillna(0)
-        if use_smoothing:
-            losses_smooth = apply_ema_smoothing(losses.tolist())
-            fig_loss.add_trace(go.Scatter(
-                x=df['global_step'],
-                y=losses_smooth,
-                mode='lines',
-                name='Loss (smoothed)',
-                line=dict(color='blue')
-            ))
-            fig_loss.add_trace(go.Scatter(
-                x=df['global_step'],
-                y=losses,
-                mode='lines',
-                name='Loss (raw)',
-                line=dict(color='lightblue', width=1),
-                opacity=0.3
-            ))
-        else:
-            fig_loss.add_trace(go.Scatter(
-                x=df['global_step'],
-                y=losses,
-                mode='lines',
-                name='Loss',
-                line=dict(color='blue')
-            ))
+    recent_events = pd.DataFrame(data[-20:][::-1])  # Last 20 events, newest first
     
-    fig_loss.update_layout(
-        xaxis_title="Step",
-        yaxis_title="Loss",
-        yaxis_type="log" if st.checkbox("Log scale", key="loss_log") else "linear",
-        height=400
-    )
-    st.plotly_chart(fig_loss, use_container_width=True)
+    # Details come from the raw records: the frame turns partly-missing int
+    # columns into floats and has no way to tell a None value from a missing key
+    details = pd.Series([
+        ", ".join(f"{k}={v}" for k, v in r.items() if k not in ("timestamp", "event", "global_step", "time"))
+        for r in reversed(data[-20:])
+    ], index=recent_events.index, dtype=object)
     
-    # Learning rate plot
-    st.subheader("📊 Learning Rate")
-    fig_lr = go.Figure()
+    if "global_step" in recent_events.columns:
+        steps = recent_events["global_step"].astype("Int64").astype("string").fillna("N/A")
+    else:
+        steps = "N/A"
     
-    if 'lr' in df.columns:
-        fig_lr.add_trace(go.Scatter(
-            x=df['global_step'],
-            y=df['lr'],
-            mode='lines',
-            name='Learning Rate',
-            line=dict(color='green')
-        ))
+    events_df = pd.DataFrame({
+        "Time": pd.to_datetime(recent_events["timestamp"], format="ISO8601", cache=True, errors="coerce").dt.strftime("%H:%M:%S").fillna("N/A"),
+        "Event": recent_events["event"].fillna("unknown"),
+        "Step": steps,
+        "Details": details.str.slice(0, 100) + "...",
+    })
     
-    fig_lr.update_layout(
-        xaxis_title="Step",
-        yaxis_title="Learning Rate",
-        height=300
-    )
-    st.plotly_chart(fig_lr, use_container_width=True)
+    st.dataframe(events_df, use_container_width=True, height=300)
     
-    # Multi-metric plot
-    st.subheader("📈 Training Metrics")
+    # Configuration info
+    if start_record:
+        with st.expander("⚙️ Training Configuration"):
+            config_data = {k: v for k, v in start_record.items() if k not in ["event", "timestamp", "time"]}
+            st.json(config_data)
+
+def main():
+    st.title("🚀 AI Toolkit Training Dashboard")
+    st.markdown("Real-time monitoring and control for AI Toolkit training runs")
     
-    # Create subplot
-    fig_multi = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Gradient Norm', 'GPU Memory (GB)', 'Speed (samples/sec)', 'CPU Memory (MB)'),
-        vertical_spacing=0.1
-    )
+    # Sidebar - Run selection
+    st.sidebar.header("Training Runs")
     
-    # Gradient norm
-    if 'grad_norm' in df.columns:
-        grad_norms = df['grad_norm'].fillna(0)
-        fig_multi.add_trace(
-            go.Scatter(x=df['global_step'], y=grad_norms, mode='lines', name='Grad Norm'),
-            row=1, col=1
-        )
-    
-    # GPU memory
-    if 'gpu_mem_allocated' in df.columns:
-        gpu_mem = df['gpu_mem_allocated'].fillna(0)
-        fig_multi.add_trace(
-            go.Scatter(x=df['global_step'], y=gpu_mem, mode='lines', name='GPU Mem', line=dict(color='red')),
-            row=1, col=2
-        )
-    
-    # Speed
-    if 'samples_per_sec' in df.columns:
-        speed = df['samples_per_sec'].fillna(0)
-        fig_multi.add_trace(
-            go.Scatter(x=df['global_step'], y=speed, mode='lines', name='Speed', line=dict(color='purple')),
-            row=2, col=1
-        )
-    
-    # CPU memory
-    if 'cpu_mem_rss_mb' in df.columns:
-        cpu_mem = df['cpu_mem_rss_mb'].fillna(0)
-        fig_multi.add_trace(
-            go.Scatter(x=df['global_step'], y=cpu_mem, mode='lines', name='CPU Mem', line=dict(color='orange')),
-            row=2, col=2
-        )
+    runs = get_available_runs()
+    if not runs:
+        st.warning("No training runs found in ./logs/ directory")
+        st.info("Start a training run with telemetry enabled to see data here.")
+        return
     
-    fig_multi.update_layout(height=600, showlegend=False)
-    st.plotly_chart(fig_multi, use_container_width=True)
+    # Run selector
+    run_options = [f"{r['name']} ({r['config_name']})" for r in runs]
+    selected_idx = st.sidebar.selectbox(
+        "Select training run:",
+        range(len(run_options)),
+        format_func=lambda x: run_options[x]
+    )
     
-    # Recent events table
-    st.subheader("📋 Recent Events")
+    selected_run = runs[selected_idx]
     
-    recent_events = data[-20:]  # Last 20 events
-    events_df = pd.DataFrame([
-        {
-            "Time": datetime.fromisoformat(r["timestamp"]).strftime("%H:%M:%S"),
-            "Event": r.get("event", "unknown"),
-            "Step": r.get("global_step", "N/A"),
-            "Details": str({k: v for k, v in r.items() if k not in ["timestamp", "event", "global_step", "time"]})[:100] + "..."
-        }
-        for r in reversed(recent_events)
-    ])
+    # Auto-refresh toggle
+    auto_refresh = st.sidebar.checkbox("Auto-refresh (5s)", value=True)
     
-    st.dataframe(events_df, use_container_width=True, height=300)
+    # Manual refresh button; the click itself triggers the rerun
+    st.sidebar.button("🔄 Refresh Now")
     
-    # Configuration info
-    if start_record:
-        with st.expander("⚙️ Training Configuration"):
-            config_data = {k: v for k, v in start_record.items() if k not in ["event", "timestamp", "time"]}
-            st.json(config_data)
+    render_run(selected_run, auto_refresh)
 
 if __name__ == "__main__":
     main()
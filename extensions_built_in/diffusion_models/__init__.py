@@ -1,22 +1,44 @@
-from .chroma import ChromaModel
-from .hidream import HidreamModel, HidreamE1Model
-from .f_light import FLiteModel
-from .omnigen2 import OmniGen2Model
-from .flux_kontext import FluxKontextModel
-from .wan22 import Wan225bModel, Wan2214bModel, Wan2214bI2VModel
-from .qwen_image import QwenImageModel, QwenImageEditModel
+import importlib
 
-AI_TOOLKIT_MODELS = [
-    # put a list of models here
-    ChromaModel,
-    HidreamModel,
-    HidreamE1Model,
-    FLiteModel,
-    OmniGen2Model,
-    FluxKontextModel,
-    Wan225bModel,
-    Wan2214bI2VModel,
-    Wan2214bModel,
-    QwenImageModel,
-    QwenImageEditModel,
-]
+# model class name -> (submodule, arch). The model modules pull in large
+# diffusers/transformers graphs, so a class is only imported on first access.
+# Each arch here must equal that class's own `arch` attribute: get_model_class
+# looks models up by these strings, so keep them in sync when renaming an arch
+# (__getattr__ raises ImportError on a mismatch whenever a class is loaded).
+_MODELS = {
+    "ChromaModel": (".chroma", "chroma"),
+    "HidreamModel": (".hidream", "hidream"),
+    "HidreamE1Model": (".hidream", "hidream_e1"),
+    "FLiteModel": (".f_light", "f-lite"),
+    "OmniGen2Model": (".omnigen2", "omnigen2"),
+    "FluxKontextModel": (".flux_kontext", "flux_kontext"),
+    "Wan225bModel": (".wan22", "wan22_5b"),
+    "Wan2214bI2VModel": (".wan22", "wan22_14b_i2v"),
+    "Wan2214bModel": (".wan22", "wan22_14b"),
+    "QwenImageModel": (".qwen_image", "qwen_image"),
+    "QwenImageEditModel": (".qwen_image", "qwen_image_edit"),
+}
+
+# lets get_model_class import only the model it needs
+AI_TOOLKIT_MODEL_ARCHS = {arch: name for name, (_, arch) in _MODELS.items()}
+
+
+def __getattr__(name):
+    if name == "AI_TOOLKIT_MODELS":
+        # the full list, in registration order; this imports every model
+        return [__getattr__(model_name) for model_name in _MODELS]
+    if name in _MODELS:
+        submodule, arch = _MODELS[name]
+        module = importlib.import_module(submodule, __name__)
+        model_class = getattr(module, name)
+        if model_class.arch != arch:
+            raise ImportError(
+                f"{name}.arch is {model_class.arch!r} but _MODELS registers it as {arch!r}"
+            )
+        globals()[name] = model_class
+        return model_class
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_MODELS) + ["AI_TOOLKIT_MODELS"])
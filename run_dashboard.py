@@ -3,6 +3,7 @@
 Launch script for the AI Toolkit Training Dashboard.
 """
 
+import importlib.util
 import subprocess
 import sys
 import os
@@ -10,17 +11,15 @@ from pathlib import Path
 
 def check_requirements():
     """Check if required packages are installed."""
-    try:
-        import streamlit
-        import plotly
-        import pandas
-        import numpy
-        return True
-    except ImportError as e:
-        print(f"Missing required package: {e}")
+    # Only look the packages up; Streamlit imports them in its own process
+    missing = [pkg for pkg in ("streamlit", "plotly", "pandas", "numpy")
+               if importlib.util.find_spec(pkg) is None]
+    if missing:
+        print(f"Missing required packages: {', '.join(missing)}")
         print("Please install dashboard requirements:")
         print("pip install -r dashboard_requirements.txt")
         return False
+    return True
 
 def main():
     """Launch the Streamlit dashboard."""
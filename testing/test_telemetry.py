@@ -0,0 +1,31 @@
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("torch")
+from toolkit.telemetry import TelemetryLogger
+
+
+def test_late_csv_fields_go_to_extras(tmp_path):
+    logger = TelemetryLogger("run", log_dir=str(tmp_path))
+    logger.log_start({"config_name": "cfg"}, {}, {}, {})
+    logger.log_step(1, 0, {"train_loss": 0.5, "lr": 1e-4})
+    logger.log_step(2, 0, {"train_loss": 0.4, "lr": 1e-4, "loss/mse": 0.3})
+    logger.log_eval(2, {"loss": 0.2})
+    logger.close()
+
+    with open(tmp_path / "run" / "metrics.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["event"] for r in rows] == ["start", "step", "step", "eval"]
+    assert rows[2]["train_loss"] == "0.4"
+
+    with open(tmp_path / "run" / "metrics.extra.csv", newline="") as f:
+        extras = list(csv.DictReader(f))
+    assert [(r["event"], r["global_step"], r["key"], r["value"]) for r in extras] == [
+        ("step", "2", "loss/mse", "0.3"),
+        ("eval", "2", "eval/loss", "0.2"),
+    ]
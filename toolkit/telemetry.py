@@ -3,22 +3,75 @@ Production-grade telemetry system for AI Toolkit training runs.
 Provides JSONL/CSV logging with optional TensorBoard/W&B integration.
 """
 
+import atexit
 import json
 import csv
+import math
 import os
+import queue
+import sys
 import time
 import threading
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional, Union, List
+from enum import IntEnum
+from typing import Callable, Dict, Any, Optional, Union, List
 from pathlib import Path
-import psutil
-import torch
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson writes NaN/Inf as null (valid JSON); numpy scalars and non-str keys
+# are accepted like the stdlib encoder would
+ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+    if orjson is not None else 0
+)
+
+# fdatasync skips the metadata update fsync does; not available everywhere
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+# Every field the log_* methods emit themselves. The CSV header is fixed at the
+# first record as these plus that record's keys, so the file never has to be
+# rewritten when another event type shows up.
+CSV_KNOWN_FIELDS = frozenset({
+    "event", "time", "timestamp", "run_name", "global_step", "epoch",
+    "train_loss", "lr", "grad_norm", "samples_per_sec", "sec_per_step",
+    "cpu_mem_rss_mb", "gpu_mem_allocated", "gpu_mem_reserved", "nan_inf_detected",
+    "checkpoint_path", "is_best", "old", "new", "source", "final_step",
+})
+
+# (whole second, formatted prefix) of the last timestamp; records logged in
+# the same second reuse the strftime result
+_iso_second = (None, "")
+
+def _iso_timestamp(t: float) -> str:
+    """Local-time ISO 8601 string for ``t`` (like ``datetime.isoformat()``, always with microseconds)."""
+    global _iso_second
+    second = int(t)
+    if _iso_second[0] != second:
+        _iso_second = (second, time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second)))
+    return f"{_iso_second[1]}.{int((t - second) * 1e6):06d}"
+
+class TelemetryLevel(IntEnum):
+    """Importance of a record; records below the logger's level are not built."""
+    VERBOSE = 10
+    STANDARD = 20
+    CRITICAL = 30
 
 class TelemetryLogger:
     """Production-grade telemetry logger with JSONL/CSV output and optional integrations."""
     
-    def __init__(self, run_name: str, log_dir: str = "./logs", enable_tensorboard: bool = False, enable_wandb: bool = False):
+    def __init__(self, run_name: str, log_dir: str = "./logs", enable_tensorboard: bool = False, enable_wandb: bool = False,
+                 level: TelemetryLevel = TelemetryLevel.STANDARD):
         self.run_name = run_name
+        self.level = level
+        # Only the first error of each kind is printed; repeats are counted and
+        # the latest distinct messages kept for a single summary at close()
+        self._error_counts: Dict[str, int] = {}
+        self._error_tail = deque(maxlen=16)
         self.log_dir = Path(log_dir)
         self.run_log_dir = self.log_dir / run_name
         self.enable_tensorboard = enable_tensorboard
@@ -30,26 +83,89 @@ class TelemetryLogger:
         # Log files
         self.jsonl_path = self.run_log_dir / "metrics.jsonl"
         self.csv_path = self.run_log_dir / "metrics.csv"
+        self.csv_extra_path = self.run_log_dir / "metrics.extra.csv"
         self.control_path = self.run_log_dir / "control.json"
         
-        # CSV writer and fieldnames
+        # JSONL is a raw O_APPEND descriptor kept open for the whole run. The
+        # writer copies encoded lines into one reused buffer and appends it
+        # once per batch, so a batch allocates nothing beyond the lines
+        self._jsonl_fd = None
+        self._jsonl_buf = bytearray(1 << 16)
+        self._jsonl_len = 0
+        try:
+            self._jsonl_fd = os.open(
+                str(self.jsonl_path),
+                os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0),
+                0o644,
+            )
+        except Exception as e:
+            print(f"[telemetry] Error opening JSONL: {e}")
+        
+        # CSV writer, the column order fixed at the first record, and every
+        # field seen so far (for the one-time "not in CSV" notice)
         self.csv_file = None
         self.csv_writer = None
+        self.csv_columns: tuple = ()
+        self._csv_column_set = frozenset()
         self.csv_fieldnames = set()
+        # Fields outside the fixed columns (loss/*, eval/*, ...) go to a long
+        # format sidecar, one row per value, opened on first use
+        self.csv_extra_file = None
+        self.csv_extra_writer = None
         
         # Optional integrations
         self.tb_writer = None
+        self._tb_proto = None
         self.wandb_run = None
+        # record key tuple -> keys that can carry a TensorBoard scalar; records
+        # of one event type have the same keys, in the same order, every step
+        self._tb_keys: Dict[tuple, tuple] = {}
+        
+        # System metrics: one process handle, sampled at most every
+        # system_metrics_interval seconds and reused in between. psutil and
+        # torch are only imported here so the module's helpers stay cheap
+        self._process = None
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            print("[telemetry] psutil not available, CPU memory will not be logged")
+        import torch
+        self._cuda = torch.cuda if torch.cuda.is_available() else None
+        self.system_metrics_interval = 0.25
+        self._system_metrics_cache = (float('-inf'), {})
         
-        # Control file monitoring
-        self.control_lock = threading.Lock()
-        self.last_control_check = 0
+        # Control file monitoring. Only the training loop polls it, and a plain
+        # int store is atomic, so the poll gate needs no lock. Polls run on a
+        # fixed monotonic grid (deadline += interval) so the period can't drift
+        self.control_check_interval_ns = 2_000_000_000
+        self._next_control_check_ns = time.monotonic_ns()
         self.control_debounce = 30  # 30 second debounce
+        # Parsed control file and the (mtime, inode, size) it was read at; only re-read on change
+        self._control_stat = None
+        self._control_data = None
         
         # Initialize integrations
         self._init_tensorboard()
         self._init_wandb()
         
+        # Background writer: log_* calls only enqueue records so the training
+        # loop never waits on file, TensorBoard or W&B I/O
+        self._queue = queue.Queue(maxsize=10000)
+        self.batch_size = 64
+        self.batch_interval = 0.2  # max seconds a record waits for its batch
+        self.dropped_records = 0
+        self._closed = False
+        # Batches only reach the page cache; the files are synced to disk at most
+        # every sync_interval seconds. durable_at is the wall time of the last sync
+        self.sync_interval = 5.0
+        self._next_sync = time.monotonic() + self.sync_interval
+        self.durable_at = None
+        self._writer_thread = threading.Thread(target=self._drain, name="telemetry-writer", daemon=True)
+        self._writer_thread.start()
+        # Drain whatever is still queued if the run exits without close()
+        atexit.register(self.close)
+        
         print(f"[telemetry] run_name={run_name}")
         print(f"[telemetry] Logging to {self.jsonl_path} (and {self.csv_path})")
     
@@ -58,8 +174,11 @@ class TelemetryLogger:
         if self.enable_tensorboard:
             try:
                 from torch.utils.tensorboard import SummaryWriter
+                from tensorboard.compat.proto.event_pb2 import Event
+                from tensorboard.compat.proto.summary_pb2 import Summary
                 tb_dir = self.run_log_dir / "tensorboard"
                 self.tb_writer = SummaryWriter(tb_dir)
+                self._tb_proto = (Event, Summary)
             except ImportError:
                 print("[telemetry] TensorBoard requested but not available. Install with: pip install tensorboard")
                 self.enable_tensorboard = False
@@ -78,29 +197,45 @@ class TelemetryLogger:
                 print("[telemetry] W&B requested but not available. Install with: pip install wandb")
                 self.enable_wandb = False
     
+    def _report_error(self, what: str, e: Exception):
+        """Print the first error of each kind; keep later ones for close()."""
+        count = self._error_counts.get(what, 0) + 1
+        self._error_counts[what] = count
+        if count == 1:
+            print(f"[telemetry] Error {what}: {e} (repeats are reported on close)")
+        else:
+            line = f"Error {what}: {e}"
+            if not self._error_tail or self._error_tail[-1] != line:
+                self._error_tail.append(line)
+    
     def _get_system_metrics(self) -> Dict[str, Any]:
-        """Get current system metrics."""
+        """Get current system metrics, reusing a sample younger than system_metrics_interval."""
+        now = time.monotonic()
+        sampled_at, cached = self._system_metrics_cache
+        if now - sampled_at < self.system_metrics_interval:
+            return cached
+        
         metrics = {}
         
         # CPU memory
         try:
-            process = psutil.Process()
-            metrics["cpu_mem_rss_mb"] = process.memory_info().rss / 1024 / 1024
+            metrics["cpu_mem_rss_mb"] = self._process.memory_info().rss / 1024 / 1024
         except:
             metrics["cpu_mem_rss_mb"] = None
         
         # GPU memory
-        if torch.cuda.is_available():
+        if self._cuda is not None:
             try:
-                metrics["gpu_mem_allocated"] = torch.cuda.memory_allocated() / 1024 / 1024 / 1024  # GB
-                metrics["gpu_mem_reserved"] = torch.cuda.memory_reserved() / 1024 / 1024 / 1024  # GB
+                metrics["gpu_mem_allocated"] = self._cuda.memory_allocated() / 1024 / 1024 / 1024  # GB
+                metrics["gpu_mem_reserved"] = self._cuda.memory_reserved() / 1024 / 1024 / 1024  # GB
             except:
                 metrics["gpu_mem_allocated"] = None
                 metrics["gpu_mem_reserved"] = None
         else:
             metrics["gpu_mem_allocated"] = None
             metrics["gpu_mem_reserved"] = None
-            
+        
+        self._system_metrics_cache = (now, metrics)
         return metrics
     
     def _detect_anomalies(self, metrics: Dict[str, Any]) -> Dict[str, bool]:
@@ -108,70 +243,100 @@ class TelemetryLogger:
         anomalies = {}
         
         # Check for NaN/Inf in loss
+        # A non-numeric loss counts as an anomaly too
         loss = metrics.get("train_loss")
-        if loss is not None:
-            anomalies["nan_inf_detected"] = not (isinstance(loss, (int, float)) and 
-                                               not (loss != loss or abs(loss) == float('inf')))
-        else:
-            anomalies["nan_inf_detected"] = False
+        anomalies["nan_inf_detected"] = loss is not None and (
+            not isinstance(loss, (int, float)) or not math.isfinite(loss)
+        )
             
         return anomalies
     
     def _write_jsonl(self, record: Dict[str, Any]):
         """Write record to JSONL file."""
+        if self._jsonl_fd is None:
+            return
+        try:
+            if orjson is not None:
+                line = orjson.dumps(record, option=ORJSON_OPTIONS)
+            else:
+                line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+            end = self._jsonl_len + len(line)
+            if end > len(self._jsonl_buf):
+                self._flush_jsonl()
+                end = len(line)
+                if end > len(self._jsonl_buf):
+                    self._jsonl_buf = bytearray(end)
+            # Same-length slice assignment copies in place without resizing
+            self._jsonl_buf[self._jsonl_len:end] = line
+            self._jsonl_len = end
+        except Exception as e:
+            self._report_error("writing JSONL", e)
+    
+    def _flush_jsonl(self):
+        """Append the buffered JSONL lines with os.write, retrying short writes."""
+        size = self._jsonl_len
+        if not size:
+            return
+        self._jsonl_len = 0
         try:
-            with open(self.jsonl_path, 'a', encoding='utf-8') as f:
-                json.dump(record, f, ensure_ascii=False)
-                f.write('\n')
-                f.flush()
+            data = memoryview(self._jsonl_buf)[:size]
+            while data:
+                written = os.write(self._jsonl_fd, data)
+                data = data[written:]
         except Exception as e:
-            print(f"[telemetry] Error writing JSONL: {e}")
+            self._report_error("writing JSONL", e)
     
     def _init_csv_writer(self, fieldnames: List[str]):
         """Initialize CSV writer with given fieldnames."""
         try:
             self.csv_file = open(self.csv_path, 'w', newline='', encoding='utf-8')
-            self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=fieldnames)
-            self.csv_writer.writeheader()
-            self.csv_file.flush()
+            self.csv_writer = csv.writer(self.csv_file)
+            self.csv_writer.writerow(fieldnames)
+            self.csv_columns = tuple(fieldnames)
+            self._csv_column_set = frozenset(fieldnames)
         except Exception as e:
-            print(f"[telemetry] Error initializing CSV: {e}")
+            self._report_error("initializing CSV", e)
+    
+    def _write_csv_extras(self, record: Dict[str, Any], keys: List[str]):
+        """Append the fields that have no column in metrics.csv to the sidecar."""
+        if self.csv_extra_writer is None:
+            self.csv_extra_file = open(self.csv_extra_path, 'w', newline='', encoding='utf-8')
+            self.csv_extra_writer = csv.writer(self.csv_extra_file)
+            self.csv_extra_writer.writerow(["time", "event", "global_step", "epoch", "key", "value"])
+        head = [record.get("time"), record.get("event"), record.get("global_step"), record.get("epoch")]
+        self.csv_extra_writer.writerows(head + [key, record[key]] for key in keys)
     
     def _write_csv(self, record: Dict[str, Any]):
         """Write record to CSV file."""
         try:
             if self.csv_writer is None:
-                # First record - initialize CSV with all fields
-                fieldnames = sorted(record.keys())
+                # First record - fix the columns for the rest of the run
+                fieldnames = sorted(CSV_KNOWN_FIELDS | record.keys())
                 self._init_csv_writer(fieldnames)
                 self.csv_fieldnames.update(fieldnames)
             else:
-                # Check if we need to add new fields
-                new_fields = set(record.keys()) - self.csv_fieldnames
+                # Fields outside the header go to the extras sidecar
+                new_fields = record.keys() - self.csv_fieldnames
                 if new_fields:
-                    # Need to recreate CSV with new fields
-                    self.csv_file.close()
                     self.csv_fieldnames.update(new_fields)
-                    fieldnames = sorted(self.csv_fieldnames)
-                    
-                    # Read existing data
-                    existing_data = []
-                    if self.csv_path.exists():
-                        with open(self.csv_path, 'r', encoding='utf-8') as f:
-                            reader = csv.DictReader(f)
-                            existing_data = list(reader)
-                    
-                    # Recreate CSV with new fields
-                    self._init_csv_writer(fieldnames)
-                    for row in existing_data:
-                        self.csv_writer.writerow(row)
+                    print(f"[telemetry] Not in CSV columns, writing to {self.csv_extra_path.name}: {', '.join(sorted(new_fields))}")
             
-            # Write the record
+            # Write the record. Cells are almost always numbers and short tags,
+            # so join them directly and only let csv.writer handle the rows
+            # where some cell needs quoting
             if self.csv_writer:
-                self.csv_writer.writerow(record)
-                self.csv_file.flush()
+                cells = ['' if v is None else str(v) for v in map(record.get, self.csv_columns)]
+                line = ','.join(cells)
+                if (line.count(',') == len(cells) - 1 and '"' not in line
+                        and '\n' not in line and '\r' not in line):
+                    self.csv_file.write(line + '\r\n')
+                else:
+                    self.csv_writer.writerow(cells)
+                extra = [k for k in record if k not in self._csv_column_set]
+                if extra:
+                    self._write_csv_extras(record, extra)
         except Exception as e:
-            print(f"[telemetry] Error writing CSV: {e}")
+            self._report_error("writing CSV", e)
     
     def _write_tensorboard(self, record: Dict[str, Any]):
         """Write metrics to TensorBoard."""
@@ -180,12 +345,27 @@ class TelemetryLogger:
             
         try:
             step = record.get("global_step", 0)
-            for key, value in record.items():
-                if isinstance(value, (int, float)) and key not in ["global_step", "epoch", "time"]:
-                    self.tb_writer.add_scalar(key, value, step)
-            self.tb_writer.flush()
+            # One event carrying every scalar instead of an event per add_scalar
+            Event, Summary = self._tb_proto
+            shape = tuple(record)
+            keys = self._tb_keys.get(shape)
+            if keys is None:
+                if len(self._tb_keys) >= 256:
+                    self._tb_keys.clear()
+                keys = self._tb_keys[shape] = tuple(
+                    key for key, value in record.items()
+                    if not isinstance(value, str) and key not in ["global_step", "epoch", "time"])
+            values = []
+            for key in keys:
+                value = record.get(key)
+                if isinstance(value, (int, float)):
+                    values.append(Summary.Value(tag=key, simple_value=value))
+            if values:
+                event = Event(wall_time=record.get("time", time.time()), step=step,
+                              summary=Summary(value=values))
+                self.tb_writer._get_file_writer().add_event(event)
         except Exception as e:
-            print(f"[telemetry] Error writing TensorBoard: {e}")
+            self._report_error("writing TensorBoard", e)
     
     def _write_wandb(self, record: Dict[str, Any]):
         """Write metrics to W&B."""
@@ -198,15 +378,86 @@ class TelemetryLogger:
                            if isinstance(v, (int, float, str)) and k not in ["time"]}
             self.wandb_run.log(wandb_record, step=step)
         except Exception as e:
-            print(f"[telemetry] Error writing W&B: {e}")
+            self._report_error("writing W&B", e)
+    
+    def _write_record(self, record: Dict[str, Any], integrations: bool):
+        """Write one record to every sink; runs on the writer thread."""
+        self._write_jsonl(record)
+        self._write_csv(record)
+        
+        if integrations:
+            if self.enable_tensorboard:
+                self._write_tensorboard(record)
+            if self.enable_wandb:
+                self._write_wandb(record)
+    
+    def _flush(self):
+        """Push buffered writes out to the files; called once per batch."""
+        try:
+            if self._jsonl_fd is not None:
+                self._flush_jsonl()
+            if self.csv_file:
+                self.csv_file.flush()
+            if self.csv_extra_file:
+                self.csv_extra_file.flush()
+            if self.tb_writer:
+                self.tb_writer.flush()
+        except Exception as e:
+            self._report_error("flushing logs", e)
+        if time.monotonic() >= self._next_sync:
+            self._sync()
+    
+    def _sync(self):
+        """fdatasync the JSONL and CSV files so their records survive a crash."""
+        try:
+            if self._jsonl_fd is not None:
+                _fdatasync(self._jsonl_fd)
+            if self.csv_file:
+                _fdatasync(self.csv_file.fileno())
+            if self.csv_extra_file:
+                _fdatasync(self.csv_extra_file.fileno())
+            self.durable_at = time.time()
+        except Exception as e:
+            self._report_error("syncing logs", e)
+        self._next_sync = time.monotonic() + self.sync_interval
+    
+    def _drain(self):
+        """Writer thread loop: write records in batches, a None item stops it."""
+        while True:
+            item = self._queue.get()
+            # Collect up to batch_size records or batch_interval seconds' worth
+            deadline = time.monotonic() + self.batch_interval
+            count = 0
+            while item is not None:
+                self._write_record(*item)
+                count += 1
+                if count >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._flush()
+            if item is None:
+                self._sync()
+                return
+    
+    def _enqueue(self, record: Dict[str, Any], integrations: bool = True):
+        """Hand a record to the writer thread, dropping it if the queue is full."""
+        try:
+            self._queue.put_nowait((record, integrations))
+        except queue.Full:
+            self.dropped_records += 1
     
     def log_start(self, config: Dict[str, Any], lora_config: Dict[str, Any], 
                   model_info: Dict[str, Any], training_info: Dict[str, Any]):
         """Log training start with configuration."""
+        now = time.time()
         record = {
             "event": "start",
-            "time": time.time(),
-            "timestamp": datetime.now().isoformat(),
+            "time": now,
+            "timestamp": _iso_timestamp(now),
             "run_name": self.run_name,
             **config,
             **lora_config,
@@ -214,24 +465,30 @@ class TelemetryLogger:
             **training_info
         }
         
-        self._write_jsonl(record)
-        self._write_csv(record)
-        
-        if self.enable_tensorboard:
-            self._write_tensorboard(record)
-        if self.enable_wandb:
-            self._write_wandb(record)
+        self._enqueue(record)
     
-    def log_step(self, global_step: int, epoch: int, metrics: Dict[str, Any]):
-        """Log training step metrics."""
+    def log_step(self, global_step: int, epoch: int,
+                 metrics: Union[Dict[str, Any], Callable[[], Dict[str, Any]]],
+                 level: TelemetryLevel = TelemetryLevel.STANDARD):
+        """Log training step metrics.
+        
+        ``metrics`` may be a callable returning the dict, so metrics that are
+        expensive to compute are only built when the level is recorded.
+        """
+        if level < self.level:
+            return
+        if callable(metrics):
+            metrics = metrics()
+        
         # Add system metrics and anomaly detection
         system_metrics = self._get_system_metrics()
         anomalies = self._detect_anomalies(metrics)
+        now = time.time()
         
         record = {
             "event": "step",
-            "time": time.time(),
-            "timestamp": datetime.now().isoformat(),
+            "time": now,
+            "timestamp": _iso_timestamp(now),
             "global_step": global_step,
             "epoch": epoch,
             **metrics,
@@ -239,110 +496,150 @@ class TelemetryLogger:
             **anomalies
         }
         
-        self._write_jsonl(record)
-        self._write_csv(record)
-        
-        if self.enable_tensorboard:
-            self._write_tensorboard(record)
-        if self.enable_wandb:
-            self._write_wandb(record)
+        self._enqueue(record)
     
-    def log_epoch(self, epoch: int, metrics: Dict[str, Any]):
+    def log_epoch(self, epoch: int, metrics: Dict[str, Any],
+                  level: TelemetryLevel = TelemetryLevel.STANDARD):
         """Log epoch-end metrics."""
+        if level < self.level:
+            return
+        now = time.time()
         record = {
             "event": "epoch",
-            "time": time.time(),
-            "timestamp": datetime.now().isoformat(),
+            "time": now,
+            "timestamp": _iso_timestamp(now),
             "epoch": epoch,
             **metrics
         }
         
-        self._write_jsonl(record)
-        self._write_csv(record)
-        
-        if self.enable_tensorboard:
-            self._write_tensorboard(record)
-        if self.enable_wandb:
-            self._write_wandb(record)
+        self._enqueue(record)
     
     def log_checkpoint(self, global_step: int, checkpoint_path: str, is_best: bool = False):
         """Log checkpoint save."""
+        now = time.time()
         record = {
             "event": "checkpoint",
-            "time": time.time(),
-            "timestamp": datetime.now().isoformat(),
+            "time": now,
+            "timestamp": _iso_timestamp(now),
             "global_step": global_step,
             "checkpoint_path": checkpoint_path,
             "is_best": is_best
         }
         
-        self._write_jsonl(record)
-        self._write_csv(record)
+        self._enqueue(record, integrations=False)
     
-    def log_eval(self, global_step: int, metrics: Dict[str, Any]):
+    def log_eval(self, global_step: int, metrics: Dict[str, Any],
+                 level: TelemetryLevel = TelemetryLevel.STANDARD):
         """Log evaluation metrics."""
+        if level < self.level:
+            return
+        now = time.time()
         record = {
             "event": "eval",
-            "time": time.time(),
-            "timestamp": datetime.now().isoformat(),
+            "time": now,
+            "timestamp": _iso_timestamp(now),
             "global_step": global_step,
             **{f"eval/{k}": v for k, v in metrics.items()}
         }
         
-        self._write_jsonl(record)
-        self._write_csv(record)
-        
-        if self.enable_tensorboard:
-            self._write_tensorboard(record)
-        if self.enable_wandb:
-            self._write_wandb(record)
+        self._enqueue(record)
     
     def check_control_file(self) -> Optional[Dict[str, Any]]:
         """Check for control file changes with debouncing."""
+        now_ns = time.monotonic_ns()
+        if now_ns < self._next_control_check_ns:  # Check every 2 seconds
+            return None
+        self._next_control_check_ns += self.control_check_interval_ns
+        if self._next_control_check_ns <= now_ns:
+            # Polled less often than the interval; realign instead of bursting
+            self._next_control_check_ns = now_ns + self.control_check_interval_ns
         current_time = time.time()
         
-        with self.control_lock:
-            if current_time - self.last_control_check < 2:  # Check every 2 seconds
-                return None
-            
-            self.last_control_check = current_time
-            
-            if not self.control_path.exists():
-                return None
-                
+        try:
+            st = os.stat(self.control_path)
+        except FileNotFoundError:
+            self._control_stat = None
+            self._control_data = None
+            return None
+        
+        # The dashboard replaces the file, so the inode changes on every write
+        # even when two writes land within the filesystem's mtime granularity
+        file_stat = (st.st_mtime_ns, st.st_ino, st.st_size)
+        if file_stat != self._control_stat:
             try:
-                with open(self.control_path, 'r') as f:
-                    control_data = json.load(f)
-                
-                # Check if enough time has passed since last change
-                change_time = control_data.get('timestamp', 0)
-                if current_time - change_time < self.control_debounce:
-                    return None
-                    
-                return control_data
+                with open(self.control_path, 'rb') as f:
+                    self._control_data = json.load(f)
             except Exception as e:
-                print(f"[telemetry] Error reading control file: {e}")
+                # Keep the stored stat unchanged so a half-written file is retried
+                self._report_error("reading control file", e)
                 return None
+            self._control_stat = file_stat
+        
+        control_data = self._control_data
+        if not isinstance(control_data, dict):
+            return None
+        
+        # Check if enough time has passed since last change
+        change_time = control_data.get('timestamp', 0)
+        if current_time - change_time < self.control_debounce:
+            return None
+        
+        return control_data
     
     def log_control_change(self, old_value: Any, new_value: Any, source: str = "dashboard"):
         """Log control parameter change."""
+        now = time.time()
         record = {
             "event": "control_change",
-            "time": time.time(),
-            "timestamp": datetime.now().isoformat(),
+            "time": now,
+            "timestamp": _iso_timestamp(now),
             "old": old_value,
             "new": new_value,
             "source": source
         }
         
-        self._write_jsonl(record)
-        self._write_csv(record)
+        self._enqueue(record, integrations=False)
     
     def close(self):
-        """Clean up resources."""
+        """Flush queued records and clean up resources."""
+        if self._closed:
+            return
+        self._closed = True
+        # Drop the exit hook's reference so a closed logger can be collected
+        atexit.unregister(self.close)
+        
+        # Let the writer finish everything queued before closing the sinks. A
+        # dead writer never drains the queue, so don't block on a full one
+        if self._writer_thread.is_alive():
+            try:
+                self._queue.put(None, timeout=30)
+            except queue.Full:
+                pass
+            self._writer_thread.join(timeout=30)
+        writer_alive = self._writer_thread.is_alive()
+        if writer_alive or not self._queue.empty():
+            print(f"[telemetry] Writer thread did not finish, abandoning ~{self._queue.qsize()} queued records")
+        if self.dropped_records:
+            print(f"[telemetry] Dropped {self.dropped_records} records (writer queue full)")
+        repeated = {what: count - 1 for what, count in self._error_counts.items() if count > 1}
+        if repeated:
+            summary = ", ".join(f"{what} x{count}" for what, count in repeated.items())
+            sys.stderr.write(f"[telemetry] Repeated errors: {summary}; latest:\n"
+                             + "".join(f"[telemetry]   {line}\n" for line in self._error_tail))
+        
+        if writer_alive:
+            # The writer still holds the sinks (e.g. stuck in a W&B call);
+            # closing them underneath it would corrupt the files
+            return
+        
         try:
+            if self._jsonl_fd is not None:
+                os.close(self._jsonl_fd)
+                self._jsonl_fd = None
             if self.csv_file:
                 self.csv_file.close()
+            if self.csv_extra_file:
+                self.csv_extra_file.close()
             if self.tb_writer:
                 self.tb_writer.close()
             if self.wandb_run:
@@ -403,8 +700,13 @@ def extract_model_info(model_config: Dict[str, Any], sd_model=None) -> Dict[str,
         try:
             network = sd_model.network
             if network:
-                trainable_params = sum(p.numel() for p in network.parameters() if p.requires_grad)
-                total_params = sum(p.numel() for p in network.parameters())
+                # One pass over the parameters for both counts
+                trainable_params = total_params = 0
+                for p in network.parameters():
+                    n = p.numel()
+                    total_params += n
+                    if p.requires_grad:
+                        trainable_params += n
                 info.update({
                     "trainable_params": trainable_params,
                     "total_params": total_params,
@@ -417,10 +719,12 @@ def extract_model_info(model_config: Dict[str, Any], sd_model=None) -> Dict[str,
 
 def extract_training_info(train_config: Dict[str, Any]) -> Dict[str, Any]:
     """Extract training configuration info."""
+    batch_size = train_config.get("batch_size", 1)
+    gradient_accumulation_steps = train_config.get("gradient_accumulation_steps", 1)
     return {
-        "batch_size": train_config.get("batch_size", 1),
-        "gradient_accumulation_steps": train_config.get("gradient_accumulation_steps", 1),
-        "effective_batch_size": train_config.get("batch_size", 1) * train_config.get("gradient_accumulation_steps", 1),
+        "batch_size": batch_size,
+        "gradient_accumulation_steps": gradient_accumulation_steps,
+        "effective_batch_size": batch_size * gradient_accumulation_steps,
         "learning_rate": train_config.get("lr", 1e-4),
         "optimizer": train_config.get("optimizer", "adamw"),
         "scheduler": train_config.get("scheduler", "constant"),
@@ -17,12 +17,10 @@ BUILT_IN_MODELS = [
 ]
 
 
-def get_all_models() -> List[BaseModel]:
+def _iter_extension_modules():
+    """Yield every importable package in the extension folders."""
     extension_folders = ['extensions', 'extensions_built_in']
 
-    # This will hold the classes from all extension modules
-    all_model_classes: List[BaseModel] = BUILT_IN_MODELS
-
     # Iterate over all directories (i.e., packages) in the "extensions" directory
     for sub_dir in extension_folders:
         extensions_dir = os.path.join(TOOLKIT_ROOT, sub_dir)
@@ -30,21 +28,48 @@ def get_all_models() -> List[BaseModel]:
             try:
                 # Import the module
                 module = importlib.import_module(f"{sub_dir}.{name}")
-                # Get the value of the AI_TOOLKIT_MODELS variable
-                models = getattr(module, "AI_TOOLKIT_MODELS", None)
-                # Check if the value is a list
-                if isinstance(models, list):
-                    # Iterate over the list and add the classes to the main list
-                    all_model_classes.extend(models)
             except ImportError as e:
                 print(f"Failed to import the {name} module. Error: {str(e)}")
+                continue
+            yield name, module
+
+
+def get_all_models() -> List[BaseModel]:
+    # This will hold the classes from all extension modules
+    all_model_classes: List[BaseModel] = BUILT_IN_MODELS
+
+    for name, module in _iter_extension_modules():
+        try:
+            # Get the value of the AI_TOOLKIT_MODELS variable
+            models = getattr(module, "AI_TOOLKIT_MODELS", None)
+            # Check if the value is a list
+            if isinstance(models, list):
+                # Iterate over the list and add the classes to the main list
+                all_model_classes.extend(models)
+        except ImportError as e:
+            print(f"Failed to import the {name} module. Error: {str(e)}")
     return all_model_classes
 
 
 def get_model_class(config: ModelConfig):
-    all_models = get_all_models()
-    for ModelClass in all_models:
+    for ModelClass in BUILT_IN_MODELS:
         if ModelClass.arch == config.arch:
             return ModelClass
+
+    for name, module in _iter_extension_modules():
+        try:
+            # packages that map arch -> class name only import the model that matches
+            model_archs = getattr(module, "AI_TOOLKIT_MODEL_ARCHS", None)
+            if isinstance(model_archs, dict):
+                if config.arch in model_archs:
+                    return getattr(module, model_archs[config.arch])
+                continue
+            models = getattr(module, "AI_TOOLKIT_MODELS", None)
+            if isinstance(models, list):
+                for ModelClass in models:
+                    if ModelClass.arch == config.arch:
+                        return ModelClass
+        except ImportError as e:
+            print(f"Failed to import the {name} module. Error: {str(e)}")
     # default to the legacy model
     return StableDiffusion